@@ -6,17 +6,20 @@
 from __future__ import annotations
 
 import hashlib
+import mmap
 import os
 import shutil
 import sys
 import tarfile
-from dataclasses import dataclass
+from contextlib import ExitStack, suppress
+from dataclasses import dataclass, field
 from pathlib import Path
-from tempfile import TemporaryDirectory
-from typing import TYPE_CHECKING, Any
+from tempfile import TemporaryDirectory, mkstemp
+from typing import IO, TYPE_CHECKING
 from zipfile import ZipFile
 
 import requests
+from requests.adapters import HTTPAdapter, Retry
 
 if TYPE_CHECKING:
     from typing import Literal
@@ -41,14 +44,81 @@ MEDIAINFO_HASHES: dict[tuple[str, str], str] = {
 }
 # fmt: on
 
+#: Names of the files removed from the output folder when cleaning
+CLEAN_FILE_NAMES: frozenset[str] = frozenset({"License.html", "LICENSE", "MediaInfo.dll"})
 
-def get_file_blake2b(file_path: os.PathLike | str, chunksize: int = 1 << 20) -> str:
+#: Prefixes of the file names removed from the output folder when cleaning
+CLEAN_FILE_PREFIXES: tuple[str, ...] = ("libmediainfo.",)
+
+
+def get_cache_dir() -> Path:
+    """Get the folder where the compressed files are cached between runs."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "pymediainfo-build" / MEDIAINFO_VERSION
+
+
+def _create_session() -> requests.Session:
+    """Create a session that reuses connections and retries failed requests."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.5),
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+#: Session shared by downloaders that are not given one
+_SESSION: requests.Session = _create_session()
+
+
+def get_file_blake2b(file_path: os.PathLike | str) -> str:
     """Get the BLAKE2b hash of a file."""
-    blake2b = hashlib.blake2b()
     with open(file_path, "rb") as f:
-        while chunk := f.read(chunksize):
-            blake2b.update(chunk)
-    return blake2b.hexdigest()
+        if sys.version_info >= (3, 11):
+            return hashlib.file_digest(f, "blake2b").hexdigest()
+        blake2b = hashlib.blake2b()
+        # Empty files cannot be mapped
+        if os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                blake2b.update(mm)
+        return blake2b.hexdigest()
+
+
+def get_default_file_mode() -> int:
+    """Get the mode of the files created by open(), according to the umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def write_file(src: IO[bytes], file_path: os.PathLike | str, mode: int | None = None) -> None:
+    """Write the content of a file object to a file.
+
+    The content is written to a temporary file in the same folder, which then replaces
+    `file_path`, so that a failure never leaves a truncated file behind. The file gets
+    `mode` if given, otherwise the mode open() would give it.
+    """
+    file_path = Path(file_path)
+    fd, tmp_name = mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".part")
+    try:
+        with open(fd, "wb") as dst:
+            shutil.copyfileobj(src, dst, length=1 << 20)
+        os.chmod(tmp_name, get_default_file_mode() if mode is None else mode)
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def extract_tar_member(fd: tarfile.TarFile, member: str | tarfile.TarInfo) -> IO[bytes]:
+    """Get a file object for a regular file of a tar archive."""
+    src = fd.extractfile(member)
+    if src is None:
+        name = member.name if isinstance(member, tarfile.TarInfo) else member
+        raise ValueError(f"not a regular file in archive: {name!r}")
+    return src
 
 
 @dataclass
@@ -57,6 +127,7 @@ class Downloader:
 
     platform: Literal["linux", "darwin", "win32"]
     arch: Literal["x86_64", "arm64", "i386"]
+    session: requests.Session | None = field(default=None, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         """Check that the combination of platform and arch is allowed."""
@@ -108,6 +179,15 @@ class Downloader:
 
         return True
 
+    def is_downloaded(self, file: os.PathLike | str) -> bool:
+        """Check if the compressed file was already downloaded and has the expected hash."""
+        if not Path(file).is_file():
+            return False
+        try:
+            return self.compare_hash(get_file_blake2b(file))
+        except ValueError:
+            return False
+
     def download_upstream(
         self,
         url: str,
@@ -117,14 +197,53 @@ class Downloader:
         verbose: bool = True,
     ) -> None:
         """Download the compressed file from upstream URL."""
-        response = requests.get(url, stream=True, timeout=timeout)
+        session = self.session if self.session is not None else _SESSION
+        response = session.get(url, stream=True, timeout=timeout)
         response.raise_for_status()
-        with open(outpath, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-
-        downloaded_hash = get_file_blake2b(outpath)
-        self.compare_hash(downloaded_hash)
+        # Content-Length only matches the file size if the body is not encoded
+        expected_size: int | None = None
+        if "Content-Encoding" not in response.headers:
+            # The size is only used to preallocate the file and check the download,
+            # a missing or malformed header just skips both
+            with suppress(ValueError):
+                expected_size = int(response.headers.get("Content-Length", 0))
+            if expected_size is not None and expected_size <= 0:
+                expected_size = None
+        outpath = Path(outpath)
+        # Write to a temporary file next to outpath and only move it there once its hash
+        # matches, so that a failed download is never left in the cache and concurrent
+        # runs don't truncate an archive that another run is unpacking
+        fd, tmp_name = mkstemp(dir=outpath.parent, prefix=f".{outpath.name}.", suffix=".part")
+        tmp_path = Path(tmp_name)
+        try:
+            # Hash the chunks while they are in memory instead of reading the file again
+            blake2b = hashlib.blake2b()
+            written = 0
+            with open(fd, "wb") as f:
+                if expected_size is not None:
+                    # Allocate the file once instead of growing it with each chunk
+                    with suppress(OSError):
+                        if hasattr(os, "posix_fallocate"):
+                            os.posix_fallocate(f.fileno(), 0, expected_size)
+                        else:
+                            f.truncate(expected_size)
+                for chunk in response.iter_content(chunk_size=1 << 20):
+                    blake2b.update(chunk)
+                    f.write(chunk)
+                    written += len(chunk)
+
+            if expected_size is not None and written != expected_size:
+                raise ValueError(
+                    f"incomplete download of {url}: expected {expected_size} bytes, got {written}"
+                )
+            downloaded_hash = blake2b.hexdigest()
+            self.compare_hash(downloaded_hash)
+            # mkstemp creates files readable by their owner only
+            os.chmod(tmp_path, get_default_file_mode())
+            os.replace(tmp_path, outpath)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
     def unpack(
         self,
@@ -138,7 +257,8 @@ class Downloader:
 
         if not file.is_file():
             raise ValueError(f"compressed file not found: {file.name!r}")
-        tmp_dir = file.parent
+        # Create the output folder once, members are then written directly into it
+        folder.mkdir(parents=True, exist_ok=True)
 
         license_file: Path | None = None
         lib_file: Path | None = None
@@ -146,46 +266,46 @@ class Downloader:
         if compressed_file.endswith(".zip") and self.platform == "linux":
             with ZipFile(file) as fd:
                 license_file = folder / "LICENSE"
-                fd.extract("LICENSE", tmp_dir)
-                shutil.move(os.fspath(tmp_dir / "LICENSE"), os.fspath(license_file))
+                with fd.open("LICENSE") as src:
+                    write_file(src, license_file)
 
                 lib_file = folder / "libmediainfo.so.0"
-                fd.extract("lib/libmediainfo.so.0.0.0", tmp_dir)
-                shutil.move(os.fspath(tmp_dir / "lib/libmediainfo.so.0.0.0"), os.fspath(lib_file))
+                with fd.open("lib/libmediainfo.so.0.0.0") as src:
+                    write_file(src, lib_file)
 
         # macOS (darwin)
         elif compressed_file.endswith(".tar.bz2") and self.platform == "darwin":
-            with tarfile.open(file) as fd:
-                kwargs: dict[str, Any] = {}
-                # Set for security reasons, see
-                # https://docs.python.org/3/library/tarfile.html#tarfile-extraction-filter
-                if sys.version_info >= (3, 12):
-                    kwargs = {"filter": "data"}
-
-                license_file = folder / "License.html"
-                fd.extract("MediaInfoLib/License.html", tmp_dir, **kwargs)
-                shutil.move(
-                    os.fspath(tmp_dir / "MediaInfoLib/License.html"),
-                    os.fspath(license_file),
-                )
-
-                lib_file = folder / "libmediainfo.0.dylib"
-                fd.extract("MediaInfoLib/libmediainfo.0.dylib", tmp_dir, **kwargs)
-                shutil.move(
-                    os.fspath(tmp_dir / "MediaInfoLib/libmediainfo.0.dylib"),
-                    os.fspath(lib_file),
-                )
+            license_file = folder / "License.html"
+            lib_file = folder / "libmediainfo.0.dylib"
+            wanted = {
+                "MediaInfoLib/License.html": license_file,
+                "MediaInfoLib/libmediainfo.0.dylib": lib_file,
+            }
+            # Read members sequentially instead of indexing the whole archive first
+            with tarfile.open(file, mode="r|bz2") as fd:
+                for member in fd:
+                    destination = wanted.pop(member.name, None)
+                    if destination is None:
+                        continue
+                    with extract_tar_member(fd, member) as src:
+                        # Keep the permissions from the archive, as the "data"
+                        # extraction filter did, the library must stay executable
+                        write_file(src, destination, mode=member.mode & 0o755)
+                    if not wanted:
+                        break
+            if wanted:
+                raise ValueError(f"files not found in archive: {sorted(wanted)}")
 
         # Windows (win32)
         elif compressed_file.endswith(".zip") and self.platform == "win32":
             with ZipFile(file) as fd:
                 license_file = folder / "License.html"
-                fd.extract("Developers/License.html", tmp_dir)
-                shutil.move(os.fspath(tmp_dir / "Developers/License.html"), os.fspath(license_file))
+                with fd.open("Developers/License.html") as src:
+                    write_file(src, license_file)
 
                 lib_file = folder / "MediaInfo.dll"
-                fd.extract("MediaInfo.dll", tmp_dir)
-                shutil.move(os.fspath(tmp_dir / "MediaInfo.dll"), os.fspath(lib_file))
+                with fd.open("MediaInfo.dll") as src:
+                    write_file(src, lib_file)
 
         files = {}
         if license_file is not None and license_file.is_file():
@@ -201,6 +321,7 @@ class Downloader:
         *,
         timeout: int = 20,
         verbose: bool = True,
+        use_cache: bool = True,
     ) -> dict[str, str]:
         """Download the library and license files."""
         folder = Path(folder)
@@ -209,11 +330,28 @@ class Downloader:
         compressed_file = self.get_compressed_file_name()
 
         extracted_files = {}
-        with TemporaryDirectory() as tmp_dir:
-            outpath = Path(tmp_dir) / compressed_file
-            if verbose:
-                print(f"Downloading MediaInfo library from {url}")
-            self.download_upstream(url, outpath, timeout=timeout, verbose=verbose)
+        with ExitStack() as stack:
+            download_dir: Path | None = None
+            if use_cache:
+                try:
+                    download_dir = get_cache_dir()
+                    download_dir.mkdir(parents=True, exist_ok=True)
+                except (OSError, RuntimeError) as exc:
+                    # The cache is optional, e.g. $HOME may be read-only or unknown
+                    if verbose:
+                        print(f"Not caching the MediaInfo library: {exc}")
+                    download_dir = None
+                    use_cache = False
+            if download_dir is None:
+                download_dir = Path(stack.enter_context(TemporaryDirectory()))
+            outpath = download_dir / compressed_file
+            if use_cache and self.is_downloaded(outpath):
+                if verbose:
+                    print(f"Using cached MediaInfo library from {os.fspath(outpath)}")
+            else:
+                if verbose:
+                    print(f"Downloading MediaInfo library from {url}")
+                self.download_upstream(url, outpath, timeout=timeout, verbose=verbose)
 
             if verbose:
                 print(f"Extracting {compressed_file}")
@@ -231,10 +369,11 @@ def download_files(
     *,
     timeout: int = 20,
     verbose: bool = True,
+    use_cache: bool = True,
 ) -> dict[str, str]:
     """Download the library and license files to the output folder."""
     downloader = Downloader(platform=platform, arch=arch)
-    return downloader.download(folder, timeout=timeout, verbose=verbose)
+    return downloader.download(folder, timeout=timeout, verbose=verbose, use_cache=use_cache)
 
 
 def clean_files(
@@ -249,18 +388,19 @@ def clean_files(
             print(f"folder does not exist: {os.fspath(folder)!r}")
         return False
 
-    glob_patterns = ["License.html", "LICENSE", "MediaInfo.dll", "libmediainfo.*"]
-
-    # list files to delete
-    to_delete: list[os.PathLike] = []
-    for pattern in glob_patterns:
-        to_delete.extend(folder.glob(pattern))
+    # list files to delete, reading the folder only once
+    with os.scandir(folder) as entries:
+        to_delete = [
+            Path(entry.path)
+            for entry in entries
+            if entry.name in CLEAN_FILE_NAMES or entry.name.startswith(CLEAN_FILE_PREFIXES)
+        ]
 
     # delete files
     if verbose:
         print(f"will delete files: {to_delete}")
-    for relative_path in to_delete:
-        (folder / relative_path).unlink()
+    for path in to_delete:
+        path.unlink()
 
     return True
 
@@ -318,6 +458,11 @@ if __name__ == "__main__":
         action="store_true",
         help="clean the output folder of downloaded files.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always download the compressed file instead of reusing a cached copy",
+    )
 
     args = parser.parse_args()
 
@@ -343,6 +488,7 @@ if __name__ == "__main__":
             args.arch,
             verbose=not args.quiet,
             timeout=args.timeout,
+            use_cache=not args.no_cache,
         )
 
     sys.exit(0)
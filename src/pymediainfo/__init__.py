@@ -5,11 +5,14 @@ This module is a wrapper for the MediaInfo library.
 from __future__ import annotations
 
 import ctypes
+import functools
+import io
 import json
 import os
 import pathlib
 import re
 import sys
+import threading
 import warnings
 import xml.etree.ElementTree as ET
 from importlib import metadata
@@ -21,6 +24,56 @@ except metadata.PackageNotFoundError:
     __version__ = ""
 
 
+# Version string returned by the "Info_Version" option
+_VERSION_RE = re.compile(r"^MediaInfoLib - v(\S+)")
+
+# Loaded libraries and their version, indexed by the library_file argument
+# they were loaded with, this avoids loading them and defining their prototypes
+# each time a file is parsed
+_LIBRARY_CACHE: dict[str | None, tuple[Any, str, tuple[int, ...]]] = {}
+
+# Values of the options set by MediaInfo.parse, indexed by the handle of the loaded
+# library (the same library may be loaded from different library_file arguments)
+_LIBRARY_OPTIONS: dict[int, dict[str, str]] = {}
+# Held while checking, setting and recording options so that the recorded
+# values always match those of the library when parse is called from threads
+_LIBRARY_OPTIONS_LOCK = threading.Lock()
+
+# Names of the options set by MediaInfo.parse, converted once instead of
+# at each MediaInfo_Option call
+_OPTION_NAMES = {
+    name: ctypes.c_wchar_p(name)
+    for name in (
+        "Cover_Data",
+        "CharSet",
+        "Inform",
+        "Complete",
+        "ParseSpeed",
+        "LegacyStreamDisplay",
+        "Reset",
+    )
+}
+
+# Value returned by MediaInfo_Open_Buffer_Continue_GoTo_Get when no seek is
+# needed, i.e. (MediaInfo_int64u)-1
+_NO_SEEK = (1 << 64) - 1
+
+# Strings that look like integers, checking them is much cheaper than catching
+# ValueError for the many values that aren't; int() can still reject some of them
+# (e.g. the integer string conversion length limit)
+_INT_RE = re.compile(r"\s*[+-]?\d+(?:_\d+)*\s*")
+
+
+# Tracks from the same file, and from different files, share most tag names
+# so the conversion is cached; interning the result speeds up attribute lookups
+@functools.lru_cache(maxsize=4096)
+def _get_attribute_name(tag: str) -> str:
+    attribute_name = tag.lower().strip().strip("_")
+    if attribute_name == "id":
+        attribute_name = "track_id"
+    return sys.intern(attribute_name)
+
+
 class Track:
     """
     An object associated with a media file track.
@@ -53,11 +106,8 @@ class Track:
             return False
         return self.__dict__ == other.__dict__
 
-    def __getattribute__(self, name: str) -> Any:
-        try:
-            return object.__getattribute__(self, name)
-        except AttributeError:
-            pass
+    def __getattr__(self, name: str) -> Any:
+        # Only called when the attribute was not found the regular way
         return None
 
     def __getstate__(self) -> dict[str, Any]:
@@ -67,42 +117,53 @@ class Track:
         self.__dict__ = state
 
     def __init__(self, xml_dom_fragment: ET.Element) -> None:
-        self.track_type = xml_dom_fragment.attrib["type"]
-        repeated_attributes = []
+        # Collect attributes in a local dict, going through getattr/setattr
+        # for each element is much slower
+        attributes: dict[str, Any] = {"track_type": xml_dom_fragment.attrib["type"]}
+        # Names of repeated attributes, mapped to the name of their other values
+        repeated_attributes: dict[str, str] = {}
         for elem in xml_dom_fragment:
-            node_name = elem.tag.lower().strip().strip("_")
-            if node_name == "id":
-                node_name = "track_id"
+            node_name = _get_attribute_name(elem.tag)
             node_value = elem.text
-            if getattr(self, node_name) is None:
-                setattr(self, node_name, node_value)
+            if attributes.get(node_name) is None:
+                attributes[node_name] = node_value
             else:
-                other_node_name = f"other_{node_name}"
-                repeated_attributes.append((node_name, other_node_name))
-                if getattr(self, other_node_name) is None:
-                    setattr(self, other_node_name, [node_value])
+                other_node_name = repeated_attributes.get(node_name)
+                if other_node_name is None:
+                    other_node_name = sys.intern(f"other_{node_name}")
+                    repeated_attributes[node_name] = other_node_name
+                if attributes.get(other_node_name) is None:
+                    attributes[other_node_name] = [node_value]
                 else:
-                    getattr(self, other_node_name).append(node_value)
-
-        for primary_key, other_key in repeated_attributes:
-            try:
-                # Attempt to convert the main value to int
-                # Usually, if an attribute is repeated, one of its value
-                # is an int and others are human-readable formats
-                setattr(self, primary_key, int(getattr(self, primary_key)))
-            except ValueError:
-                # If it fails, try to find a secondary value
-                # that is an int and swap it with the main value
-                for other_value in getattr(self, other_key):
-                    try:
-                        current = getattr(self, primary_key)
-                        # Set the main value to an int
-                        setattr(self, primary_key, int(other_value))
-                        # Append its previous value to other values
-                        getattr(self, other_key).append(current)
-                        break
-                    except ValueError:
-                        pass
+                    attributes[other_node_name].append(node_value)
+
+        for primary_key, other_key in repeated_attributes.items():
+            # Attempt to convert the main value to int
+            # Usually, if an attribute is repeated, one of its value
+            # is an int and others are human-readable formats
+            primary_value = attributes[primary_key]
+            if _INT_RE.fullmatch(primary_value):
+                try:
+                    attributes[primary_key] = int(primary_value)
+                    continue
+                except ValueError:
+                    pass
+            # If it fails, try to find a secondary value
+            # that is an int and swap it with the main value
+            other_values = attributes[other_key]
+            for other_value in other_values:
+                if not _INT_RE.fullmatch(other_value):
+                    continue
+                try:
+                    # Set the main value to an int
+                    attributes[primary_key] = int(other_value)
+                except ValueError:
+                    continue
+                # Append its previous value to other values
+                other_values.append(primary_value)
+                break
+        # Populate the instance in a single step once all values are final
+        self.__dict__.update(attributes)
 
     def __repr__(self) -> str:
         return "<Track track_id='{}', track_type='{}'>".format(self.track_id, self.track_type)
@@ -143,9 +204,16 @@ class MediaInfo:
     >>> with open("output.xml") as f:
     ...     mi = pymediainfo.MediaInfo(f.read())
 
-    :param str xml: XML output obtained from MediaInfo.
+    The XML may also be passed as :class:`bytes`, which avoids decoding it
+    only for it to be encoded again before parsing:
+
+    >>> with open("output.xml", "rb") as f:
+    ...     mi = pymediainfo.MediaInfo(f.read())
+
+    :param xml: XML output obtained from MediaInfo.
+    :type xml: str or bytes
     :param str encoding_errors: option to pass to :func:`str.encode`'s `errors`
-        parameter before parsing `xml`.
+        parameter before parsing `xml`, ignored if `xml` is :class:`bytes`.
     :raises xml.etree.ElementTree.ParseError: if passed invalid XML.
     :var tracks: A list of :py:class:`Track` objects which the media file contains.
         For instance:
@@ -155,6 +223,8 @@ class MediaInfo:
         ...     print(t)
         <Track track_id='None', track_type='General'>
         <Track track_id='1', track_type='Text'>
+
+        Shortcuts such as :attr:`video_tracks` follow the changes made to this list.
     """
 
     def __eq__(self, other: object) -> bool:
@@ -162,21 +232,73 @@ class MediaInfo:
             return False
         return self.tracks == other.tracks
 
-    def __init__(self, xml: str, encoding_errors: str = "strict") -> None:
-        xml_dom = ET.fromstring(xml.encode("utf-8", encoding_errors))
+    def __getstate__(self) -> dict[str, Any]:
+        # Leave out the grouped tracks, they are rebuilt when needed and the
+        # ids they are checked against only make sense in this process
+        return {
+            name: value
+            for name, value in self.__dict__.items()
+            if name not in ("_tracks_by_type", "_grouped_track_ids")
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+
+    def __init__(self, xml: str | bytes, encoding_errors: str = "strict") -> None:
         self.tracks = []
-        # This is the case for libmediainfo < 18.03
-        # https://github.com/sbraz/pymediainfo/issues/57
-        # https://github.com/MediaArea/MediaInfoLib/commit/575a9a32e6960ea34adb3bc982c64edfa06e95eb
-        if xml_dom.tag == "File":
-            xpath = "track"
-        else:
-            xpath = "File/track"
-        for xml_track in xml_dom.iterfind(xpath):
-            self.tracks.append(Track(xml_track))
+        # Tracks grouped by type, used by the track shortcut properties
+        self._tracks_by_type: dict[str, list[Track]] = {}
+        # Stream the XML so that each track is released once it has been parsed
+        # instead of building the whole tree first
+        xml_source = io.BytesIO(
+            xml if isinstance(xml, bytes) else xml.encode("utf-8", encoding_errors)
+        )
+        # Tags of the elements enclosing the one being parsed, and the elements themselves
+        path: list[str] = []
+        parents: list[ET.Element] = []
+        track_parents: list[str] = []
+        for event, elem in ET.iterparse(xml_source, events=("start", "end")):
+            if event == "start":
+                if not path:
+                    # The root is <File> for libmediainfo < 18.03
+                    # https://github.com/sbraz/pymediainfo/issues/57
+                    # https://github.com/MediaArea/MediaInfoLib/commit/575a9a32e6960ea34adb3bc982c64edfa06e95eb
+                    if elem.tag == "File":
+                        track_parents = [elem.tag]
+                    else:
+                        track_parents = [elem.tag, "File"]
+                path.append(elem.tag)
+                parents.append(elem)
+                continue
+            path.pop()
+            parents.pop()
+            if elem.tag == "track" and path == track_parents:
+                track = Track(elem)
+                self.tracks.append(track)
+                self._tracks_by_type.setdefault(track.track_type, []).append(track)
+                # Detach the parsed track so that the tree doesn't keep every track
+                parents[-1].remove(elem)
+        self._grouped_track_ids = list(map(id, self.tracks))
+
+    def _group_tracks(self) -> dict[str, list[Track]]:
+        tracks_by_type: dict[str, list[Track]] = {}
+        for track in self.tracks:
+            # Read the track type from the instance dict to bypass attribute lookups
+            tracks_by_type.setdefault(track.__dict__["track_type"], []).append(track)
+        self._tracks_by_type = tracks_by_type
+        self._grouped_track_ids = list(map(id, self.tracks))
+        return tracks_by_type
 
     def _tracks(self, track_type: str) -> list[Track]:
-        return [track for track in self.tracks if track.track_type == track_type]
+        tracks_by_type = self.__dict__.get("_tracks_by_type")
+        # Group the tracks again if tracks was changed since they were grouped or
+        # if the object was unpickled; the ids can't be reused by other objects
+        # since the grouped tracks are still referenced. This check is O(n) but
+        # runs in C, unlike the attribute lookups done for each track by a scan
+        track_ids = list(map(id, self.tracks))
+        if tracks_by_type is None or track_ids != self.__dict__.get("_grouped_track_ids"):
+            tracks_by_type = self._group_tracks()
+        return list(tracks_by_type.get(track_type, ()))
 
     @property
     def general_tracks(self) -> list[Track]:
@@ -265,7 +387,7 @@ class MediaInfo:
         lib.MediaInfo_Open_Buffer_Init.restype = ctypes.c_size_t
         lib.MediaInfo_Open_Buffer_Continue.argtypes = [
             ctypes.c_void_p,
-            ctypes.c_char_p,
+            ctypes.POINTER(ctypes.c_ubyte),
             ctypes.c_size_t,
         ]
         lib.MediaInfo_Open_Buffer_Continue.restype = ctypes.c_size_t
@@ -279,6 +401,7 @@ class MediaInfo:
         lib.MediaInfo_Close.restype = None
 
     @staticmethod
+    @functools.lru_cache(maxsize=4)
     def _get_library_paths(os_is_nt: bool) -> tuple[str, ...]:
         library_paths: tuple[str, ...]
         if os_is_nt:
@@ -302,6 +425,11 @@ class MediaInfo:
         cls,
         library_file: str | None = None,
     ) -> tuple[Any, Any, str, tuple[int, ...]]:
+        cached_library = _LIBRARY_CACHE.get(library_file)
+        if cached_library is not None:
+            lib, lib_version_str, lib_version = cached_library
+            # Handles cannot be shared, each call needs its own
+            return (lib, lib.MediaInfo_New(), lib_version_str, lib_version)
         os_is_nt = os.name in ("nt", "dos", "os2", "ce")
         lib_type = ctypes.WinDLL if os_is_nt else ctypes.CDLL  # type: ignore[attr-defined]
         if library_file is None:
@@ -317,12 +445,13 @@ class MediaInfo:
                 # https://github.com/sbraz/pymediainfo/issues/76#issuecomment-574759621
                 handle = lib.MediaInfo_New()
                 version = lib.MediaInfo_Option(handle, "Info_Version", "")
-                match = re.search(r"^MediaInfoLib - v(\S+)", version)
+                match = _VERSION_RE.search(version)
                 if match:
                     lib_version_str = match.group(1)
                     lib_version = tuple(int(_) for _ in lib_version_str.split("."))
                 else:
                     raise RuntimeError("Could not determine library version")
+                _LIBRARY_CACHE[library_file] = (lib, lib_version_str, lib_version)
                 return (lib, handle, lib_version_str, lib_version)
             except OSError as exc:
                 exceptions.append(str(exc))
@@ -451,7 +580,8 @@ class MediaInfo:
 
                 * ``%``-delimited templates (see ``mediainfo --Info-Parameters``)
         :param int buffer_size: size of the buffer used to read the file, in bytes. This is only
-            used when `filename` is a file-like object.
+            used when `filename` is a file-like object. ``None`` or a negative value reads the
+            whole file at once.
         :type filename: str or pathlib.Path or os.PathLike or file-like object.
         :rtype: str if `output` is set.
         :rtype: :class:`MediaInfo` otherwise.
@@ -480,15 +610,30 @@ class MediaInfo:
             xml_option = "OLDXML"
         else:
             xml_option = "XML"
+        options = {}
         # Cover_Data is not extracted by default since version 18.03
         # See https://github.com/MediaArea/MediaInfoLib/commit/d8fd88a1
         if lib_version >= (18, 3):
-            lib.MediaInfo_Option(handle, "Cover_Data", "base64" if cover_data else "")
-        lib.MediaInfo_Option(handle, "CharSet", "UTF-8")
-        lib.MediaInfo_Option(handle, "Inform", xml_option if output is None else output)
-        lib.MediaInfo_Option(handle, "Complete", "1" if full else "")
-        lib.MediaInfo_Option(handle, "ParseSpeed", str(parse_speed))
-        lib.MediaInfo_Option(handle, "LegacyStreamDisplay", "1" if legacy_stream_display else "")
+            options["Cover_Data"] = "base64" if cover_data else ""
+        options["CharSet"] = "UTF-8"
+        options["Inform"] = xml_option if output is None else output
+        options["Complete"] = "1" if full else ""
+        options["ParseSpeed"] = str(parse_speed)
+        options["LegacyStreamDisplay"] = "1" if legacy_stream_display else ""
+        # These options are shared by all handles of a library, only set
+        # those whose value differs from the one set by the previous call
+        with _LIBRARY_OPTIONS_LOCK:
+            last_options = _LIBRARY_OPTIONS.setdefault(
+                lib._handle, {}  # pylint: disable=protected-access
+            )
+            for option_name, option_value in options.items():
+                if last_options.get(option_name) != option_value:
+                    lib.MediaInfo_Option(handle, _OPTION_NAMES[option_name], option_value)
+                    last_options[option_name] = option_value
+            if mediainfo_options is not None:
+                # Custom options can change any option and are then reset,
+                # all options will be set again by the next call
+                last_options.clear()
         if mediainfo_options is not None:
             if lib_version < (19, 9):
                 warnings.warn(
@@ -500,11 +645,13 @@ class MediaInfo:
                 )
             for option_name, option_value in mediainfo_options.items():
                 lib.MediaInfo_Option(handle, option_name, option_value)
-        try:
+        # Checking for the attributes is cheaper than catching
+        # AttributeError when filename is not a file-like object
+        if hasattr(filename, "seek") and hasattr(filename, "read"):
             filename.seek(0, 2)
             file_size = filename.tell()
             filename.seek(0)
-        except AttributeError:  # filename is not a file-like object
+        else:
             file_size = None
 
         if file_size is not None:  # We have a file-like object, use the buffer protocol:
@@ -512,17 +659,32 @@ class MediaInfo:
             if "b" not in getattr(filename, "mode", "b"):
                 raise ValueError("File should be opened in binary mode")
             lib.MediaInfo_Open_Buffer_Init(handle, file_size, 0)
+            # Reuse a single buffer, shared with the library, for all reads,
+            # a missing or negative buffer_size means reading the whole file at once
+            buffer = bytearray(file_size if buffer_size is None or buffer_size < 0 else buffer_size)
+            c_buffer = (ctypes.c_ubyte * len(buffer)).from_buffer(buffer)
+            readinto = getattr(filename, "readinto", None)
             while True:
-                buffer = filename.read(buffer_size)
-                if buffer:
+                if readinto is not None:
+                    try:
+                        length = readinto(buffer)
+                    except (NotImplementedError, io.UnsupportedOperation):
+                        # Inherited but not implemented, e.g. by io.RawIOBase subclasses
+                        # that only implement read(), use read() from now on
+                        readinto = None
+                if readinto is None:
+                    data = filename.read(len(buffer))
+                    length = len(data)
+                    buffer[:length] = data
+                if length:
                     # https://github.com/MediaArea/MediaInfoLib/blob/v20.09/Source/MediaInfo/File__Analyze.h#L1429
                     # 4th bit = finished
-                    if lib.MediaInfo_Open_Buffer_Continue(handle, buffer, len(buffer)) & 0x08:
+                    if lib.MediaInfo_Open_Buffer_Continue(handle, c_buffer, length) & 0x08:
                         break
                     # Ask MediaInfo if we need to seek
                     seek = lib.MediaInfo_Open_Buffer_Continue_GoTo_Get(handle)
                     # https://github.com/MediaArea/MediaInfoLib/blob/v20.09/Source/MediaInfoDLL/MediaInfoJNI.cpp#L127
-                    if seek != ctypes.c_uint64(-1).value:
+                    if seek != _NO_SEEK:
                         filename.seek(seek)
                         # Inform MediaInfo we have sought
                         lib.MediaInfo_Open_Buffer_Init(handle, file_size, filename.tell())
@@ -549,7 +711,7 @@ class MediaInfo:
         # Do not call it when it is not required because it breaks threads
         # https://github.com/sbraz/pymediainfo/issues/76#issuecomment-575245093
         if mediainfo_options is not None and lib_version >= (19, 9):
-            lib.MediaInfo_Option(handle, "Reset", "")
+            lib.MediaInfo_Option(handle, _OPTION_NAMES["Reset"], "")
         # Delete the handle
         lib.MediaInfo_Close(handle)
         lib.MediaInfo_Delete(handle)
@@ -563,7 +725,8 @@ class MediaInfo:
 
         :rtype: dict
         """
-        return {"tracks": [_.to_data() for _ in self.tracks]}
+        # Equivalent to calling Track.to_data on each track, without the method calls
+        return {"tracks": [track.__dict__ for track in self.tracks]}
 
     def to_json(self) -> str:
         """
@@ -1,17 +1,21 @@
 # pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring,
 # pylint: disable=protected-access
 
+import concurrent.futures
 import functools
 import http.server
+import io
 import json
 import os
 import pathlib
 import pickle
+import re
 import sys
 import tempfile
 import threading
 import unittest
 import xml
+from collections.abc import Iterator
 
 import pytest
 
@@ -26,8 +30,34 @@ test_media_files = [
     "mp3.mp3",
     "mp4-with-audio.mp4",
 ]
-
-
+# Paths of the files used by the tests, built once
+TEST_PATHS = {
+    name: os.path.join(data_dir, name)
+    for name in test_media_files
+    + [
+        "sample.xml",
+        "issue100.xml",
+        "invalid.xml",
+        "accentué.txt",
+        "aac_he_v2.aac",
+        "vbr_requires_parsespeed_1.mp4",
+        "empty.gif",
+        "other_track.xml",
+        "issue55.flv",
+    ]
+}
+_STREAM_SIZE_RE = re.compile(r"Stream size\s+: 373836\b")
+
+
+# Files read as bytes by the tests are small and never modified so they are only read once
+@functools.lru_cache(maxsize=None)
+def _read_test_file(name: str) -> bytes:
+    with open(TEST_PATHS[name], "rb") as f:
+        return f.read()
+
+
+# The version can't change while the tests run
+@functools.lru_cache(maxsize=1)
 def _get_library_version() -> tuple[str, tuple[int, ...]]:
     lib, handle, lib_version_str, lib_version = MediaInfo._get_library()
     lib.MediaInfo_Close(handle)
@@ -36,10 +66,14 @@ def _get_library_version() -> tuple[str, tuple[int, ...]]:
 
 
 class MediaInfoTest(unittest.TestCase):
-    def setUp(self) -> None:
-        with open(os.path.join(data_dir, "sample.xml"), "r", encoding="utf-8") as f:
-            self.xml_data = f.read()
-        self.media_info = MediaInfo(self.xml_data)
+    xml_data: str
+    media_info: MediaInfo
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        with open(TEST_PATHS["sample.xml"], "r", encoding="utf-8") as f:
+            cls.xml_data = f.read()
+        cls.media_info = MediaInfo(cls.xml_data)
 
     def test_populate_tracks(self) -> None:
         self.assertEqual(4, len(self.media_info.tracks))
@@ -60,42 +94,79 @@ class MediaInfoTest(unittest.TestCase):
                 break
 
     def test_track_other_attributes(self) -> None:
-        general_tracks = [
-            track for track in self.media_info.tracks if track.track_type == "General"
-        ]
-        general_track = general_tracks[0]
+        general_track = self.media_info.general_tracks[0]
         self.assertEqual(5, len(general_track.other_file_size))
         self.assertEqual(
             ["1mn 1s", "1mn 1s 394ms", "1mn 1s", "00:01:01.394"], general_track.other_duration
         )
 
     def test_track_existing_other_attributes(self) -> None:
-        with open(os.path.join(data_dir, "issue100.xml"), encoding="utf-8") as f:
-            media_info = MediaInfo(f.read())
-        general_tracks = [track for track in media_info.tracks if track.track_type == "General"]
-        general_track = general_tracks[0]
+        media_info = MediaInfo(_read_test_file("issue100.xml"))
+        general_track = media_info.general_tracks[0]
         self.assertEqual(general_track.other_format_list, "RTP / RTP")
 
+    @pytest.mark.skipif(
+        not hasattr(sys, "get_int_max_str_digits"),
+        reason="This Python version has no integer string conversion length limit",
+    )
+    def test_track_integer_attributes_too_long_for_int(self) -> None:
+        # Longer than the default integer string conversion length limit
+        too_long = "1" * 5000
+        media_info = MediaInfo(
+            "<File><track type='General'>"
+            f"<Duration>{too_long}</Duration><Duration>61394</Duration>"
+            f"<File_size>{too_long}</File_size><File_size>{too_long}</File_size>"
+            "</track></File>"
+        )
+        general_track = media_info.general_tracks[0]
+        self.assertEqual(general_track.duration, 61394)
+        self.assertEqual(general_track.other_duration, ["61394", too_long])
+        self.assertEqual(general_track.file_size, too_long)
+
     def test_load_mediainfo_from_string(self) -> None:
         self.assertEqual(4, len(self.media_info.tracks))
 
+    def test_load_mediainfo_from_bytes(self) -> None:
+        self.assertEqual(MediaInfo(self.xml_data.encode("utf-8")), self.media_info)
+
     def test_getting_attribute_that_doesnot_exist(self) -> None:
         self.assertTrue(self.media_info.tracks[0].does_not_exist is None)
 
+    def test_track_shortcuts_follow_tracks_changes(self) -> None:
+        media_info = MediaInfo(self.xml_data)
+        video_track = media_info.video_tracks[0]
+        media_info.tracks.remove(video_track)
+        self.assertEqual(media_info.video_tracks, [])
+        media_info.tracks.append(video_track)
+        self.assertEqual(media_info.video_tracks, [video_track])
+        media_info.tracks = [video_track]
+        self.assertEqual(media_info.general_tracks, [])
+        self.assertEqual(media_info.video_tracks, [video_track])
+
+    def test_track_shortcuts_without_grouped_tracks(self) -> None:
+        media_info = MediaInfo(self.xml_data)
+        # This is the case for objects pickled by older versions
+        del media_info._tracks_by_type
+        self.assertEqual(len(media_info.video_tracks), 1)
+        self.assertEqual(media_info.video_tracks[0].codec, "DV")
+
 
 class MediaInfoInvalidXMLTest(unittest.TestCase):
     def setUp(self) -> None:
-        with open(os.path.join(data_dir, "invalid.xml"), "r", encoding="utf-8") as f:
-            self.xml_data = f.read()
+        self.xml_data = _read_test_file("invalid.xml")
 
     def test_parse_invalid_xml(self) -> None:
         self.assertRaises(xml.etree.ElementTree.ParseError, MediaInfo, self.xml_data)
 
 
 class MediaInfoLibraryTest(unittest.TestCase):
-    def setUp(self) -> None:
-        self.media_info = MediaInfo.parse(os.path.join(data_dir, "sample.mp4"))
-        self.non_full_mi = MediaInfo.parse(os.path.join(data_dir, "sample.mp4"), full=False)
+    media_info: MediaInfo
+    non_full_mi: MediaInfo
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.media_info = MediaInfo.parse(TEST_PATHS["sample.mp4"])
+        cls.non_full_mi = MediaInfo.parse(TEST_PATHS["sample.mp4"], full=False)
 
     def test_can_parse_true(self) -> None:
         self.assertTrue(MediaInfo.can_parse())
@@ -117,33 +188,84 @@ class MediaInfoLibraryTest(unittest.TestCase):
         self.assertEqual(self.media_info.tracks[0].footersize, "59")
         self.assertEqual(self.non_full_mi.tracks[0].footersize, None)
 
+    def test_library_is_loaded_once(self) -> None:
+        lib, handle = MediaInfo._get_library()[:2]
+        other_lib, other_handle = MediaInfo._get_library()[:2]
+        for _handle in (handle, other_handle):
+            lib.MediaInfo_Close(_handle)
+            lib.MediaInfo_Delete(_handle)
+        self.assertIs(lib, other_lib)
+        self.assertNotEqual(handle, other_handle)
+
     def test_raises_on_nonexistent_library(self) -> None:
         with tempfile.TemporaryDirectory() as tmp_dir:
             nonexistent_library = os.path.join(tmp_dir, "nonexistent-libmediainfo.so")
             with pytest.raises(OSError) as exc:
-                MediaInfo.parse(
-                    os.path.join(data_dir, "sample.mp4"), library_file=nonexistent_library
-                )
+                MediaInfo.parse(TEST_PATHS["sample.mp4"], library_file=nonexistent_library)
             assert rf"Failed to load library from {nonexistent_library}" in str(exc.value)
 
 
 class MediaInfoFileLikeTest(unittest.TestCase):
     def test_can_parse(self) -> None:
-        with open(os.path.join(data_dir, "sample.mp4"), "rb") as f:
+        with open(TEST_PATHS["sample.mp4"], "rb") as f:
             MediaInfo.parse(f)
 
+    def test_negative_buffer_size_reads_whole_file(self) -> None:
+        with open(TEST_PATHS["sample.mkv"], "rb") as f:
+            media_info = MediaInfo.parse(f, buffer_size=-1)
+        with open(TEST_PATHS["sample.mkv"], "rb") as f:
+            self.assertEqual(media_info, MediaInfo.parse(f, buffer_size=None))
+
+    def test_can_parse_without_readinto(self) -> None:
+        class ReadOnlyFile:
+            def __init__(self, data: bytes) -> None:
+                self._file = io.BytesIO(data)
+
+            def read(self, size: int = -1) -> bytes:
+                return self._file.read(size)
+
+            def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+                return self._file.seek(offset, whence)
+
+            def tell(self) -> int:
+                return self._file.tell()
+
+        data = _read_test_file("sample.mkv")
+        media_info = MediaInfo.parse(ReadOnlyFile(data))
+        self.assertEqual(media_info, MediaInfo.parse(io.BytesIO(data)))
+
+    def test_can_parse_raw_io_without_readinto(self) -> None:
+        # io.RawIOBase provides a readinto() that raises NotImplementedError
+        class ReadOnlyRawFile(io.RawIOBase):
+            def __init__(self, data: bytes) -> None:
+                super().__init__()
+                self._file = io.BytesIO(data)
+
+            def read(self, size: int = -1) -> bytes:
+                return self._file.read(size)
+
+            def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+                return self._file.seek(offset, whence)
+
+            def tell(self) -> int:
+                return self._file.tell()
+
+        data = _read_test_file("sample.mkv")
+        media_info = MediaInfo.parse(ReadOnlyRawFile(data))
+        self.assertEqual(media_info, MediaInfo.parse(io.BytesIO(data)))
+
     def test_raises_on_text_mode_even_with_text(self) -> None:
-        with open(os.path.join(data_dir, "sample.xml"), encoding="utf-8") as f:
+        with open(TEST_PATHS["sample.xml"], encoding="utf-8") as f:
             self.assertRaises(ValueError, MediaInfo.parse, f)
 
     def test_raises_on_text_mode(self) -> None:
-        with open(os.path.join(data_dir, "sample.mkv"), encoding="utf-8") as f:
+        with open(TEST_PATHS["sample.mkv"], encoding="utf-8") as f:
             self.assertRaises(ValueError, MediaInfo.parse, f)
 
 
 class MediaInfoUnicodeXMLTest(unittest.TestCase):
     def setUp(self) -> None:
-        self.media_info = MediaInfo.parse(os.path.join(data_dir, "sample.mkv"))
+        self.media_info = MediaInfo.parse(TEST_PATHS["sample.mkv"])
 
     def test_parse_file_with_unicode_tags(self) -> None:
         self.assertEqual(
@@ -156,7 +278,7 @@ class MediaInfoUnicodeXMLTest(unittest.TestCase):
 
 class MediaInfoUnicodeFileNameTest(unittest.TestCase):
     def setUp(self) -> None:
-        self.media_info = MediaInfo.parse(os.path.join(data_dir, "accentué.txt"))
+        self.media_info = MediaInfo.parse(TEST_PATHS["accentué.txt"])
 
     def test_parse_unicode_file(self) -> None:
         self.assertEqual(len(self.media_info.tracks), 1)
@@ -167,20 +289,29 @@ class MediaInfoUnicodeFileNameTest(unittest.TestCase):
     reason="SimpleHTTPRequestHandler's 'directory' argument was added in Python 3.7",
 )
 class MediaInfoURLTest(unittest.TestCase):
-    def setUp(self) -> None:
+    httpd: http.server.HTTPServer
+    server_thread: threading.Thread
+    url: str
+
+    @classmethod
+    def setUpClass(cls) -> None:
         HandlerClass = functools.partial(  # pylint: disable=invalid-name
             http.server.SimpleHTTPRequestHandler,
             directory=data_dir,
         )
         # Pick a random port so that parallel tests (e.g. via 'tox -p') do not clash
-        self.httpd = http.server.HTTPServer(("", 0), HandlerClass)
-        port = self.httpd.socket.getsockname()[1]
-        self.url = f"http://127.0.0.1:{port}/sample.mkv"
-        threading.Thread(target=self.httpd.serve_forever).start()
-
-    def tearDown(self) -> None:
-        self.httpd.shutdown()
-        self.httpd.server_close()
+        cls.httpd = http.server.HTTPServer(("", 0), HandlerClass)
+        port = cls.httpd.socket.getsockname()[1]
+        cls.url = f"http://127.0.0.1:{port}/sample.mkv"
+        # Daemonize the thread so that it can't keep the process alive
+        cls.server_thread = threading.Thread(target=cls.httpd.serve_forever, daemon=True)
+        cls.server_thread.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.httpd.shutdown()
+        cls.httpd.server_close()
+        cls.server_thread.join()
 
     def test_parse_url(self) -> None:
         media_info = MediaInfo.parse(self.url)
@@ -231,11 +362,13 @@ class MediaInfoTestParseNonExistentFile(unittest.TestCase):
 
 
 class MediaInfoCoverDataTest(unittest.TestCase):
-    def setUp(self) -> None:
-        self.cover_mi = MediaInfo.parse(
-            os.path.join(data_dir, "sample_with_cover.mp3"), cover_data=True
-        )
-        self.no_cover_mi = MediaInfo.parse(os.path.join(data_dir, "sample_with_cover.mp3"))
+    cover_mi: MediaInfo
+    no_cover_mi: MediaInfo
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.cover_mi = MediaInfo.parse(TEST_PATHS["sample_with_cover.mp3"], cover_data=True)
+        cls.no_cover_mi = MediaInfo.parse(TEST_PATHS["sample_with_cover.mp3"])
 
     def test_parse_cover_data(self) -> None:
         self.assertEqual(
@@ -256,7 +389,7 @@ class MediaInfoCoverDataTest(unittest.TestCase):
 
 class MediaInfoTrackParsingTest(unittest.TestCase):
     def test_track_parsing(self) -> None:
-        media_info = MediaInfo.parse(os.path.join(data_dir, "issue55.flv"))
+        media_info = MediaInfo.parse(TEST_PATHS["issue55.flv"])
         self.assertEqual(len(media_info.tracks), 2)
 
 
@@ -270,7 +403,7 @@ class MediaInfoRuntimeErrorTest(unittest.TestCase):
 class MediaInfoSlowParseTest(unittest.TestCase):
     def setUp(self) -> None:
         self.media_info = MediaInfo.parse(
-            os.path.join(data_dir, "vbr_requires_parsespeed_1.mp4"), parse_speed=1
+            TEST_PATHS["vbr_requires_parsespeed_1.mp4"], parse_speed=1
         )
 
     def test_slow_parse_speed(self) -> None:
@@ -278,10 +411,16 @@ class MediaInfoSlowParseTest(unittest.TestCase):
 
 
 class MediaInfoEqTest(unittest.TestCase):
-    def setUp(self) -> None:
-        self.mp3_mi = MediaInfo.parse(os.path.join(data_dir, "sample_with_cover.mp3"))
-        self.mp3_other_mi = MediaInfo.parse(os.path.join(data_dir, "sample_with_cover.mp3"))
-        self.mp4_mi = MediaInfo.parse(os.path.join(data_dir, "sample.mp4"))
+    mp3_mi: MediaInfo
+    mp3_other_mi: MediaInfo
+    mp4_mi: MediaInfo
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.mp3_mi = MediaInfo.parse(TEST_PATHS["sample_with_cover.mp3"])
+        # Parsed separately to compare distinct objects
+        cls.mp3_other_mi = MediaInfo.parse(TEST_PATHS["sample_with_cover.mp3"])
+        cls.mp4_mi = MediaInfo.parse(TEST_PATHS["sample.mp4"])
 
     def test_eq(self) -> None:
         self.assertEqual(self.mp3_mi.tracks[0], self.mp3_other_mi.tracks[0])
@@ -290,18 +429,31 @@ class MediaInfoEqTest(unittest.TestCase):
         self.assertNotEqual(self.mp3_mi, self.mp4_mi)
 
     def test_pickle_unpickle(self) -> None:
-        pickled_track = pickle.dumps(self.mp4_mi.tracks[0])
-        self.assertEqual(self.mp4_mi.tracks[0], pickle.loads(pickled_track))
-        pickled_mi = pickle.dumps(self.mp4_mi)
-        self.assertEqual(self.mp4_mi, pickle.loads(pickled_mi))
+        pickled_track = pickle.dumps(self.mp4_mi.tracks[0], protocol=pickle.HIGHEST_PROTOCOL)
+        unpickled_track = pickle.loads(pickled_track)
+        self.assertEqual(self.mp4_mi.tracks[0], unpickled_track)
+        pickled_mi = pickle.dumps(self.mp4_mi, protocol=pickle.HIGHEST_PROTOCOL)
+        unpickled_mi = pickle.loads(pickled_mi)
+        self.assertEqual(self.mp4_mi, unpickled_mi)
+        # Pickling the unpickled objects again must give the same bytes
+        for pickled, unpickled in ((pickled_track, unpickled_track), (pickled_mi, unpickled_mi)):
+            self.assertEqual(pickle.dumps(unpickled, protocol=pickle.HIGHEST_PROTOCOL), pickled)
+
+    def test_pickle_leaves_out_grouped_tracks(self) -> None:
+        self.assertEqual(len(self.mp4_mi.video_tracks), 1)
+        unpickled_mi = pickle.loads(pickle.dumps(self.mp4_mi))
+        self.assertEqual(list(unpickled_mi.__dict__), ["tracks"])
+        self.assertEqual(unpickled_mi.video_tracks, [unpickled_mi.tracks[1]])
 
 
 class MediaInfoLegacyStreamDisplayTest(unittest.TestCase):
-    def setUp(self) -> None:
-        self.media_info = MediaInfo.parse(os.path.join(data_dir, "aac_he_v2.aac"))
-        self.legacy_mi = MediaInfo.parse(
-            os.path.join(data_dir, "aac_he_v2.aac"), legacy_stream_display=True
-        )
+    media_info: MediaInfo
+    legacy_mi: MediaInfo
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.media_info = MediaInfo.parse(TEST_PATHS["aac_he_v2.aac"])
+        cls.legacy_mi = MediaInfo.parse(TEST_PATHS["aac_he_v2.aac"], legacy_stream_display=True)
 
     def test_legacy_stream_display(self) -> None:
         self.assertEqual(self.media_info.tracks[1].channel_s, 2)
@@ -309,22 +461,26 @@ class MediaInfoLegacyStreamDisplayTest(unittest.TestCase):
 
 
 class MediaInfoOptionsTest(unittest.TestCase):
-    def setUp(self) -> None:
+    raw_language_mi: MediaInfo
+    normal_mi: MediaInfo
+
+    @classmethod
+    def setUpClass(cls) -> None:
         lib_version_str, lib_version = _get_library_version()
         if lib_version < (19, 9):
             pytest.skip(
                 "The Reset option is not supported by this library version "
                 "(v{} detected, v19.09 required)".format(lib_version_str)
             )
-        self.raw_language_mi = MediaInfo.parse(
-            os.path.join(data_dir, "sample.mkv"),
+        cls.raw_language_mi = MediaInfo.parse(
+            TEST_PATHS["sample.mkv"],
             mediainfo_options={"Language": "raw"},
         )
         # Parsing the file without the custom options afterwards
         # allows us to check that the "Reset" option worked
         # https://github.com/MediaArea/MediaInfoLib/issues/1128
-        self.normal_mi = MediaInfo.parse(
-            os.path.join(data_dir, "sample.mkv"),
+        cls.normal_mi = MediaInfo.parse(
+            TEST_PATHS["sample.mkv"],
         )
 
     def test_mediainfo_options(self) -> None:
@@ -332,48 +488,46 @@ class MediaInfoOptionsTest(unittest.TestCase):
         self.assertEqual(self.raw_language_mi.tracks[1].language, "en")
 
 
+# Number of parses run concurrently by test_thread_safety
+THREAD_COUNT = 100
+
+
+# Shared by all the parametrizations of test_thread_safety so that
+# its threads are only started once
+@pytest.fixture(name="parse_pool", scope="session")
+def fixture_parse_pool() -> Iterator[concurrent.futures.ThreadPoolExecutor]:
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=THREAD_COUNT, thread_name_prefix="mi-parse"
+    ) as pool:
+        yield pool
+
+
 # Unittests can't be parametrized
 # https://github.com/pytest-dev/pytest/issues/541
 @pytest.mark.parametrize("test_file", test_media_files)
-def test_thread_safety(test_file: str) -> None:
+def test_thread_safety(test_file: str, parse_pool: concurrent.futures.ThreadPoolExecutor) -> None:
     lib_version_str, lib_version = _get_library_version()
     if lib_version < (20, 3):
         pytest.skip(
             "This version of the library is not thread-safe "
             "(v{} detected, v20.03 required)".format(lib_version_str)
         )
-    expected_result = MediaInfo.parse(os.path.join(data_dir, test_file))
-    results = []
-    lock = threading.Lock()
-
-    def target() -> None:
-        try:
-            result = MediaInfo.parse(os.path.join(data_dir, test_file))
-            with lock:
-                results.append(result)
-        except Exception:  # pylint: disable=broad-except
-            pass
-
-    threads = []
-    thread_count = 100
-    for _ in range(thread_count):
-        thread = threading.Thread(target=target)
-        thread.start()
-        threads.append(thread)
-    for thread in threads:
-        thread.join()
-    # Each thread should have produced a result
-    assert len(results) == thread_count
+    path = TEST_PATHS[test_file]
+    expected_result = MediaInfo.parse(path)
+    expected_data = expected_result.to_data()
+    futures = [parse_pool.submit(MediaInfo.parse, path) for _ in range(THREAD_COUNT)]
+    # This raises the exceptions raised by the parses, if any
+    results = [future.result() for future in futures]
     for res in results:
         # Test dicts first because they will show a diff
         # in case they don't match
-        assert res.to_data() == expected_result.to_data()
+        assert res.to_data() == expected_data
         assert res == expected_result
 
 
 @pytest.mark.parametrize("test_file", test_media_files)
 def test_filelike_returns_the_same(test_file: str) -> None:
-    filename = os.path.join(data_dir, test_file)
+    filename = TEST_PATHS[test_file]
     mi_from_filename = MediaInfo.parse(filename)
     with open(filename, "rb") as f:
         mi_from_file = MediaInfo.parse(f)
@@ -388,8 +542,8 @@ def test_filelike_returns_the_same(test_file: str) -> None:
 
 class MediaInfoOutputTest(unittest.TestCase):
     def test_text_output(self) -> None:
-        media_info = MediaInfo.parse(os.path.join(data_dir, "sample.mp4"), output="")
-        self.assertRegex(media_info, r"Stream size\s+: 373836\b")
+        media_info = MediaInfo.parse(TEST_PATHS["sample.mp4"], output="")
+        self.assertRegex(media_info, _STREAM_SIZE_RE)
 
     def test_json_output(self) -> None:
         lib_version_str, lib_version = _get_library_version()
@@ -398,24 +552,27 @@ class MediaInfoOutputTest(unittest.TestCase):
                 "This version of the library does not support JSON output "
                 "(v{} detected, v18.03 required)".format(lib_version_str)
             )
-        media_info = MediaInfo.parse(os.path.join(data_dir, "sample.mp4"), output="JSON")
+        media_info = MediaInfo.parse(TEST_PATHS["sample.mp4"], output="JSON")
         parsed = json.loads(media_info)
         self.assertEqual(parsed["media"]["track"][0]["FileSize"], "404567")
 
     def test_parameter_output(self) -> None:
-        media_info = MediaInfo.parse(
-            os.path.join(data_dir, "sample.mp4"), output="General;%FileSize%"
-        )
+        media_info = MediaInfo.parse(TEST_PATHS["sample.mp4"], output="General;%FileSize%")
         self.assertEqual(media_info, "404567")
 
 
 class MediaInfoTrackShortcutsTests(unittest.TestCase):
-    def setUp(self) -> None:
-        self.mi_audio = MediaInfo.parse(os.path.join(data_dir, "sample.mp4"))
-        self.mi_text = MediaInfo.parse(os.path.join(data_dir, "sample.mkv"))
-        self.mi_image = MediaInfo.parse(os.path.join(data_dir, "empty.gif"))
-        with open(os.path.join(data_dir, "other_track.xml"), encoding="utf-8") as f:
-            self.mi_other = MediaInfo(f.read())
+    mi_audio: MediaInfo
+    mi_text: MediaInfo
+    mi_image: MediaInfo
+    mi_other: MediaInfo
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.mi_audio = MediaInfo.parse(TEST_PATHS["sample.mp4"])
+        cls.mi_text = MediaInfo.parse(TEST_PATHS["sample.mkv"])
+        cls.mi_image = MediaInfo.parse(TEST_PATHS["empty.gif"])
+        cls.mi_other = MediaInfo(_read_test_file("other_track.xml"))
 
     def test_empty_list(self) -> None:
         self.assertEqual(self.mi_audio.text_tracks, [])